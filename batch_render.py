@@ -0,0 +1,287 @@
+"""
+headless sweep renderer: drives the SignalSamplingApp layout offscreen over a list of sampling rates / methods / SNRs
+and writes every frame as PNG and/or a GIF/MP4 (needs imageio, and imageio-ffmpeg for MP4)
+
+    python batch_render.py "Sampling_scenarios/ECG_Signal.csv" --rates 2:60 --methods sinc,zoh --out frames/
+    python batch_render.py "Sampling_scenarios/first_Alias Frequencies/base 2,6 hz.csv" --rates 2:24 --video sweep.gif
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import itertools
+import multiprocessing
+import queue
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5 import QtGui, QtWidgets
+
+import kernels
+from main import SignalSamplingApp
+from signal_mixer import SignalMixer
+
+METHOD_ALIASES = {
+    "sinc": "Whittaker-Shanon (sinc)",
+    "zoh": "Zero-Order Hold",
+    "linear": "Linear",
+    "cubic": "Cubic Spline",
+}
+
+
+"""
+frame computation (process pool): each worker gets the composed signal once through the initializer
+"""
+_worker_state = {}
+
+
+def _init_worker(time, signal, max_time_axis, seed):
+    kernels.warm_up()
+    _worker_state.update(time=time, signal=signal, max_time_axis=max_time_axis, seed=seed)
+
+
+def compute_frame(job):
+    index, sampling_rate, method, snr = job
+    time, signal = _worker_state["time"], _worker_state["signal"]
+    # seeded per frame so a sweep renders the same noise whatever the number of workers
+    rng = np.random.default_rng((_worker_state["seed"], index))
+
+    noised_signal = kernels.gaussian_noise(signal, snr, rng, out=np.empty_like(signal))
+    noised_signal += signal
+    sample_points = kernels.sample_indices(len(time), sampling_rate, _worker_state["max_time_axis"])
+    sampled_time = time[sample_points]
+    sampled_signal = noised_signal[sample_points]
+
+    reconstructed_signal = kernels.RECONSTRUCTION_METHODS[method](sampled_time, sampled_signal, time)
+    error, mean_error = kernels.reconstruction_error(signal, reconstructed_signal)
+    return job, sampled_time, sampled_signal, noised_signal, reconstructed_signal, error, mean_error
+
+
+"""
+frame writing (background thread): bounded queue so rendering blocks instead of piling up images in memory
+"""
+class FrameWriter(threading.Thread):
+    def __init__(self, out_dir=None, video=None, fps=10, max_pending=16):
+        super().__init__(daemon=True)
+        self.out_dir = out_dir
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.video_writer = None
+        if video:
+            try:
+                import imageio
+            except ImportError:
+                raise SystemExit("Writing GIF/MP4 needs imageio (pip install imageio imageio-ffmpeg)")
+            self.video_writer = imageio.get_writer(video, fps=fps)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+    def put(self, index, image):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((index, image))
+
+    def close(self):
+        # finishes the pending frames, the caller checks self.error afterwards
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                index, image = item
+                if self.out_dir:
+                    image.save(os.path.join(self.out_dir, f"frame_{index:04d}.png"))
+                if self.video_writer is not None:
+                    self.video_writer.append_data(self.to_array(image))
+        except Exception as e:
+            self.error = e
+            # finalize what was written so far right away, then keep draining until close()
+            # so the renderer never blocks on a dead writer
+            self.close_video()
+            while self.queue.get() is not None:
+                pass
+        finally:
+            self.close_video()
+
+    def close_video(self):
+        if self.video_writer is not None:
+            self.video_writer.close()
+            self.video_writer = None
+
+    @staticmethod
+    def to_array(image):
+        image = image.convertToFormat(QtGui.QImage.Format_RGB888)
+        pointer = image.constBits()
+        pointer.setsize(image.sizeInBytes())
+        rows = np.frombuffer(pointer, np.uint8).reshape(image.height(), image.bytesPerLine())
+        return rows[:, :image.width() * 3].reshape(image.height(), image.width(), 3).copy()
+
+
+"""
+rendering (GUI thread): same window as the app, but the plot items are created once and only get new data
+"""
+class SweepRenderer():
+    def __init__(self, window):
+        self.window = window
+        for plot in (window.original_plot, window.reconstructed_plot, window.error_plot, window.frequency_plot):
+            plot.clear()
+
+        self.original_curve = window.original_plot.plot(pen='#007AFF', name="Original Signal")
+        self.sample_points = window.original_plot.plot(pen=None, symbol='o', symbolBrush='r')
+        self.reconstructed_curve = window.reconstructed_plot.plot(pen='#007AFF')
+        self.error_curve = window.error_plot.plot(pen='#007AFF')
+        # the spectrum doesn't change during a sweep, only the shifted copies move with the sampling rate
+        window.frequency_plot.plot(window.fft_freqs, window.fft_original, pen=pg.mkPen('#007AFF', width=3))
+        self.upper_alias = window.frequency_plot.plot(pen=pg.mkPen('r', width=2))
+        self.lower_alias = window.frequency_plot.plot(pen=pg.mkPen('r', width=2))
+
+        window.set_same_viewing_range()
+        window.frequency_plot.setXRange(-max(window.f_max, 20), max(window.f_max, 20))
+
+    def render(self, frame):
+        (index, sampling_rate, method, snr), sampled_time, sampled_signal, noised_signal, \
+            reconstructed_signal, error, mean_error = frame
+        window = self.window
+
+        self.update_controls(sampling_rate, method, snr)
+        self.original_curve.setData(window.time, noised_signal)
+        self.sample_points.setData(sampled_time, sampled_signal)
+        self.reconstructed_curve.setData(window.time, reconstructed_signal)
+        self.error_curve.setData(window.time, error)
+        window.set_error_title(f'error: {round(mean_error, 2)}')
+        self.upper_alias.setData(window.fft_freqs + sampling_rate + 0.2, window.fft_original)
+        self.lower_alias.setData(window.fft_freqs - sampling_rate - 0.2, window.fft_original)
+
+        QtWidgets.QApplication.processEvents()
+        return window.grab().toImage()
+
+    def update_controls(self, sampling_rate, method, snr):
+        # mirror the frame parameters on the control panel without triggering the app's own recompute
+        window = self.window
+        for widget in (window.sampling_slider, window.reconstruction_method_comboBox, window.mixer.snr_slider):
+            widget.blockSignals(True)
+        window.sampling_rate = sampling_rate
+        window.update_sampling_slider()
+        if not window.toggle._checked:  # the slider clamps to 4 * f_max, the sweep may go past it
+            window.sampling_label.setText(f"Sampling Frequency: {sampling_rate} Hz")
+        window.reconstruction_method_comboBox.setCurrentText(method)
+        window.mixer.snr_slider.setValue(int(snr))
+        window.mixer.snr_label.setText(f"SNR Level: {int(snr)} dB")
+        for widget in (window.sampling_slider, window.reconstruction_method_comboBox, window.mixer.snr_slider):
+            widget.blockSignals(False)
+
+
+def parse_rates(text):
+    # "2:40" (inclusive), "2:40:2" or "4,8,12"
+    if ":" in text:
+        bounds = [int(value) for value in text.split(":")]
+        start, stop = bounds[0], bounds[1]
+        step = bounds[2] if len(bounds) > 2 else 1
+        rates = list(range(start, stop + 1, step))
+    else:
+        rates = [int(value) for value in text.split(",")]
+    if not rates or min(rates) < 2:  # same minimum as the app's sampling slider
+        raise argparse.ArgumentTypeError(f"Sampling rates must be at least 2 Hz: {text}")
+    # above one sample per time-axis point the sample indices repeat (and sinc divides by T = 0)
+    max_rate = SignalSamplingApp.N_POINTS // SignalSamplingApp.MAX_TIME_AXIS
+    if max(rates) > max_rate:
+        raise argparse.ArgumentTypeError(f"Sampling rates must be at most {max_rate} Hz: {text}")
+    return rates
+
+
+def parse_methods(text):
+    methods = []
+    for name in text.split(","):
+        method = METHOD_ALIASES.get(name.strip(), name.strip())
+        if method not in kernels.RECONSTRUCTION_METHODS:
+            raise argparse.ArgumentTypeError(f"Unknown reconstruction method: {name}")
+        methods.append(method)
+    return methods
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render a sampling sweep of a signal file offscreen.")
+    parser.add_argument("signal_file", help="signal file as accepted by the mixer Import button (.csv/.txt/.bin)")
+    parser.add_argument("--rates", type=parse_rates, default=parse_rates("2:40"),
+                        help="sampling rates in Hz: start:stop[:step] or comma separated (default 2:40)")
+    parser.add_argument("--methods", type=parse_methods, default=parse_methods("sinc"),
+                        help="comma separated: " + ", ".join(METHOD_ALIASES) + " (default sinc)")
+    parser.add_argument("--snr", type=lambda text: [int(value) for value in text.split(",")], default=[100],
+                        help="comma separated SNR levels in dB (default 100)")
+    parser.add_argument("--out", help="directory for PNG frames")
+    parser.add_argument("--video", help="GIF or MP4 file to write the frames to")
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--size", default="1200x800", help="window size WxH (default 1200x800)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--float32", action="store_true", help="use the single precision pipeline")
+    args = parser.parse_args(argv)
+    if not args.out and not args.video:
+        parser.error("nothing to write, give --out and/or --video")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    with open("style/style.qss", "r") as f:
+        app.setStyleSheet(f.read())
+    kernels.warm_up()
+
+    window = SignalSamplingApp()
+    width, height = (int(value) for value in args.size.split("x"))
+    window.resize(width, height)
+    if args.float32:
+        window.precision_toggle.setChecked(True)
+        window.update_precision(True)
+    try:
+        window.mixer.add_component(imported_signal=SignalMixer.read_signal_file(args.signal_file))
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Could not read {args.signal_file}: {e}")
+    window.show()
+
+    jobs = [(index, rate, method, snr) for index, (method, snr, rate)
+            in enumerate(itertools.product(args.methods, args.snr, args.rates))]
+    renderer = SweepRenderer(window)
+    writer = FrameWriter(args.out, args.video, args.fps)
+    writer.start()
+
+    # spawn: the parent already runs Qt, forking it isn't safe
+    context = multiprocessing.get_context("spawn")
+    initargs = (window.time, window.signal.copy(), window.max_time_axis, args.seed)
+    workers = args.workers or 1
+    pool = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=initargs)
+    try:
+        # at most 2 * workers frames in flight, so finished frames can't pile up behind the renderer
+        remaining = iter(jobs)
+        pending = deque(pool.submit(compute_frame, job) for job in itertools.islice(remaining, 2 * workers))
+        while pending:
+            frame = pending.popleft().result()
+            job = next(remaining, None)
+            if job is not None:
+                pending.append(pool.submit(compute_frame, job))
+            writer.put(frame[0][0], renderer.render(frame))
+            print(f"\rrendered {frame[0][0] + 1}/{len(jobs)}", end="", flush=True)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        writer.close()
+        raise
+    pool.shutdown()
+    writer.close()
+    print()
+    window.close()
+    if writer.error is not None:
+        raise writer.error
+
+
+if __name__ == '__main__':
+    main()
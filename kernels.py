@@ -0,0 +1,280 @@
+import os
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+try:
+    import numba
+except ImportError:  # numba is optional, everything falls back to numpy
+    numba = None
+
+
+BACKENDS = ("numba", "numpy") if numba is not None else ("numpy",)
+BACKEND = BACKENDS[0]
+
+# max number of elements in one (targets x samples) sinc block for the numpy path
+_SINC_BLOCK_ELEMENTS = 1 << 20
+
+
+def set_backend(name):
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError("Unavailable kernel backend: {}".format(name))
+    BACKEND = name
+
+
+def _use_numba():
+    return BACKEND == "numba"
+
+
+# backend is picked once at import, can be forced with SAMPLING_STUDIO_BACKEND=numpy
+set_backend(os.environ.get("SAMPLING_STUDIO_BACKEND", BACKENDS[0]))
+
+
+"""
+numpy kernels (fallback), results are the same as the numba ones up to summation order
+"""
+def _sinc_interp_np(x, s, t, T, out):
+    # blocks of target rows so the sinc matrix never grows with len(t); the sinc argument is
+    # computed from float64 times (like the numba kernel), only the matrix product runs in s.dtype
+    step = max(1, _SINC_BLOCK_ELEMENTS // len(x))
+    for start in range(0, len(t), step):
+        stop = start + step
+        out[start:stop] = np.sinc((t[start:stop, None] - x) / T).astype(s.dtype, copy=False) @ s
+    return out
+
+
+def _zero_order_hold_np(x, s, t, out):
+    return np.take(s, _grid(x, t).hold_index, out=out, mode='wrap')  # -1 -> last sample, like s[-1]
+
+
+def _compose_tones_np(time, omegas, amplitudes, phases, out):
+    tone = np.empty_like(time)
+    for omega, amplitude, phase in zip(omegas, amplitudes, phases):
+        np.multiply(omega, time, out=tone)
+        tone += phase
+        np.sin(tone, out=tone)
+        tone *= amplitude
+        out += tone
+    return out
+
+
+def _error_np(signal, reconstructed, out, scratch):
+    np.subtract(signal, reconstructed, out=out)
+    return out, np.mean(np.abs(out, out=scratch))
+
+
+class _Grid():
+    """
+    per (sample positions, target positions) lookups, they only change with the sampling rate
+    so ZOH / linear / cubic reuse them and fill their output with in-place takes
+    (np.take with mode 'wrap'/'clip', 'raise' would buffer out)
+    """
+    def __init__(self, x, t):
+        self.x = x.copy()
+        self.t = t  # kept so its id() can't be reused while cached
+        self.hold_index = np.searchsorted(x, t) - 1
+        # segment of every target (np.interp / CubicSpline convention: ends extend the first/last one)
+        self.segment = np.clip(np.searchsorted(x, t, side='right') - 1, 0, len(x) - 2)
+        self.next_segment = self.segment + 1
+        self.offset = t - x[self.segment]  # float64, t - x of the segment start
+        self.weight = np.clip(self.offset / np.diff(x)[self.segment], 0, 1)
+        self._by_dtype = {}
+
+    def matches(self, x, t):
+        return t is self.t and len(x) == len(self.x) and np.array_equal(x, self.x)
+
+    def for_dtype(self, dtype):
+        # (offset, weight, scratch) in the precision of the samples
+        if dtype not in self._by_dtype:
+            self._by_dtype[dtype] = (self.offset.astype(dtype), self.weight.astype(dtype),
+                                     np.empty(len(self.t), dtype=dtype))
+        return self._by_dtype[dtype]
+
+
+_grids = {}
+
+
+def _grid(x, t):
+    grid = _grids.get(id(t))
+    if grid is None or not grid.matches(x, t):
+        if len(_grids) > 4:  # app time axis + drift probe (+ a stray caller), no need for more
+            _grids.clear()
+        grid = _grids[id(t)] = _Grid(x, t)
+    return grid
+
+
+"""
+numba kernels, each target sample is computed in one pass without temporaries
+"""
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _sinc_interp_nb(x, s, t, T, out):
+        for i in numba.prange(t.shape[0]):
+            acc = 0.0
+            for j in range(x.shape[0]):
+                u = (t[i] - x[j]) / T
+                if u == 0.0:
+                    acc += s[j]
+                else:
+                    y = np.pi * u
+                    acc += s[j] * (np.sin(y) / y)
+            out[i] = acc
+        return out
+
+    @numba.njit(parallel=True, cache=True)
+    def _zero_order_hold_nb(x, s, t, out):
+        for i in numba.prange(t.shape[0]):
+            out[i] = s[np.searchsorted(x, t[i]) - 1]
+        return out
+
+    @numba.njit(parallel=True, cache=True)
+    def _compose_tones_nb(time, omegas, amplitudes, phases, out):
+        for i in numba.prange(time.shape[0]):
+            acc = out[i]
+            for k in range(omegas.shape[0]):
+                acc += amplitudes[k] * np.sin(omegas[k] * time[i] + phases[k])
+            out[i] = acc
+        return out
+
+    @numba.njit(parallel=True, cache=True)
+    def _error_nb(signal, reconstructed, out):
+        total = 0.0
+        for i in numba.prange(signal.shape[0]):
+            e = signal[i] - reconstructed[i]
+            out[i] = e
+            total += abs(e)
+        return out, total / signal.shape[0]
+
+
+"""
+1. sinc: for each target time (t_i), we sum contributions from all samples (s) weighted by sinc function based on
+  distance from each sample position (x). Good for bandlimited signals / signal is sampled above Nyquist rate
+"""
+def sinc_interp(x, s, t, out=None):  # sinc(x) = sin(πx)/(πx) (Whittaker-Shannon)
+    """
+    x: sample positions (sampling_t)
+    s: sample values (sampled_signal)
+    t: target positions (continuous time for reconstruction)
+    """
+    if out is None:
+        out = np.empty(t.shape, dtype=s.dtype)
+    T = x[1] - x[0]
+    if _use_numba():
+        return _sinc_interp_nb(x, s, t, T, out)
+    return _sinc_interp_np(x, s, t, T, out)
+
+
+"""
+2. zero_order : for each target time (t_i), it finds index of  last sample <= t_i.. and uses its val. to hold
+  constant until next sampling point. Simpole but might lead to significant distortion, especially for rapidly changing signals.
+"""
+def zero_order_hold(x, s, t, out=None):  # maintain last sampled value until next sample is taken
+    if out is None:
+        out = np.empty(t.shape, dtype=s.dtype)
+    if _use_numba():
+        return _zero_order_hold_nb(x, s, t, out)
+    return _zero_order_hold_np(x, s, t, out)
+
+
+"""
+3. linear : for each target time (t_i), it uses np.interp function to perform linear interpolation between two nearest sample points.
+  Has smoother transition than Zero but is still bad for non-linear signals.
+"""
+def linear_interp(x, s, t, out=None):  # connect sample points linearly
+    # same as np.interp(t, x, s), but in s.dtype and without full-length temporaries
+    if out is None:
+        out = np.empty(t.shape, dtype=s.dtype)
+    grid = _grid(x, t)
+    _, weight, scratch = grid.for_dtype(s.dtype)
+    np.take(s, grid.next_segment, out=out, mode='clip')
+    np.take(s, grid.segment, out=scratch, mode='clip')
+    out -= scratch
+    out *= weight
+    out += scratch
+    return out
+
+
+"""
+4.cubic
+"""
+def cubic_spline_interp(x, s, t, out=None):  # connects by cubic functions leading to smoother connection
+    # spline coefficients from scipy (per sample, small), evaluated with Horner's rule in s.dtype
+    if out is None:
+        out = np.empty(t.shape, dtype=s.dtype)
+    coefficients = CubicSpline(x, s).c.astype(s.dtype)
+    grid = _grid(x, t)
+    offset, _, scratch = grid.for_dtype(s.dtype)
+    np.take(coefficients[0], grid.segment, out=out, mode='clip')
+    for coefficient in coefficients[1:]:
+        out *= offset
+        out += np.take(coefficient, grid.segment, out=scratch, mode='clip')
+    return out
+
+
+RECONSTRUCTION_METHODS = {
+    "Whittaker-Shanon (sinc)": sinc_interp,
+    "Zero-Order Hold": zero_order_hold,
+    "Linear": linear_interp,
+    "Cubic Spline": cubic_spline_interp,
+}
+
+
+def compose_tones(time, tones, out):
+    """
+    adds sum of amplitude * sin(2π f t + phase) for every (frequency, amplitude, phase) tone to out,
+    phase in degrees like the mixer components
+    """
+    if not tones:
+        return out
+    frequency, amplitude, phase = (np.asarray(column, dtype=np.float64) for column in zip(*tones))
+    omegas = 2 * np.pi * frequency
+    phases = np.deg2rad(phase)
+    if _use_numba():
+        return _compose_tones_nb(time, omegas, amplitude, phases, out)
+    return _compose_tones_np(time, omegas, amplitude, phases, out)
+
+
+def reconstruction_error(signal, reconstructed, out=None, scratch=None):
+    """
+    returns (signal - reconstructed, mean absolute error) in a single pass,
+    scratch (same shape/dtype as signal) holds |error| on the numpy backend
+    """
+    if out is None:
+        out = np.empty_like(signal)
+    if _use_numba():
+        return _error_nb(signal, reconstructed, out)
+    if scratch is None:
+        scratch = np.empty_like(signal)
+    return _error_np(signal, reconstructed, out, scratch)
+
+
+def sample_indices(n_points, sampling_rate, duration):
+    # good reconstruction at 2 * fmax + 1
+    return np.arange(0, n_points - 1, n_points / (sampling_rate * duration)).astype(int)
+
+
+def gaussian_noise(signal, snr_db, rng, out):
+    # convert SNR from dB to linear scale
+    snr_linear = 10 ** (snr_db / 10.0)
+    signal_power = np.dot(signal, signal) / len(signal)  # calculate signal power
+    # calculate noise power to achieve req. SNR
+    noise_power = signal_power / snr_linear
+    # generate Gaussian noise with: mean = 0 , calculated standard deviation (in place, no new array)
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= np.sqrt(noise_power)
+    return out
+
+
+def warm_up():
+    # compile (or load from the on-disk cache) every numba kernel before the first slider move
+    if not _use_numba():
+        return
+    x = np.linspace(0, 1, 4)
+    t = np.linspace(0, 1, 8)
+    for dtype in (np.float64, np.float32):  # one specialization per precision mode
+        s = np.sin(x).astype(dtype)
+        out = np.zeros(t.shape, dtype=dtype)
+        _sinc_interp_nb(x, s, t, x[1] - x[0], out)
+        _zero_order_hold_nb(x, s, t, out)
+        _compose_tones_nb(t, x, x, x, out)
+        _error_nb(out, out.copy(), np.empty_like(out))
@@ -6,27 +6,35 @@ from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
 import pyqtgraph as pg
 from scipy.fft import fft, fftfreq
-from scipy.interpolate import interp1d, CubicSpline, lagrange
 from signal_mixer import SignalMixer
 from style.styling_methods import style_plot_widget
 from signal_construct import Signal
 from style.toggle import ToggleSwitch
+from spectrogram import Spectrogram
+import kernels
 
 
 class SignalSamplingApp(QtWidgets.QWidget):
+    MAX_TIME_AXIS = 10  # seconds
+    N_POINTS = 20000  # points on the time axis, sampling above N_POINTS / MAX_TIME_AXIS Hz repeats points
+
     def __init__(self):
         super().__init__()
         self.interp_method = None
+        self.dtype = np.float64  # float32 in single precision mode
+        self.rng = np.random.default_rng()
         self.f_max = 2
         self.sampling_rate = 2
 
         self.mixer = SignalMixer()
+        # one STFT cache per signal so switching sources doesn't throw away unchanged frames
+        self.spectrograms = {source: Spectrogram() for source in ("Original", "Reconstructed", "Error")}
         self.initUI()
 
-        self.max_time_axis = 10
-        self.time = np.linspace(0, self.max_time_axis, 20000)
-        self.signal = np.zeros_like(self.time)
-        self.noise_signal = np.zeros_like(self.time)
+        self.max_time_axis = self.MAX_TIME_AXIS
+        # time stays float64 in both modes: 2π·f·t phases at 100 Hz x 10 s aren't safe in float32
+        self.time = np.linspace(0, self.max_time_axis, self.N_POINTS)
+        self.allocate_buffers()
 
         self.mixer.update_signal.connect(self.update_original_signal)
         self.mixer.update_noise.connect(self.sample_and_reconstruct)
@@ -96,6 +104,42 @@ class SignalSamplingApp(QtWidgets.QWidget):
 
         control_panel.addLayout(toggle_layout)
 
+        precision_layout = QtWidgets.QHBoxLayout()
+        self.precision_toggle = ToggleSwitch()
+        self.precision_toggle.setChecked(False)
+        self.precision_toggle.stateChanged.connect(self.update_precision)
+        precision_layout.addWidget(QtWidgets.QLabel("Single Precision (float32)"))
+        precision_layout.addWidget(self.precision_toggle)
+        control_panel.addLayout(precision_layout)
+
+        # frequency panel: global spectrum or spectrogram of one of the signals
+        frequency_view_layout = QtWidgets.QHBoxLayout()
+        frequency_view_layout.addWidget(QtWidgets.QLabel("Frequency View: "))
+        self.frequency_view_comboBox = QtWidgets.QComboBox(self)
+        self.frequency_view_comboBox.addItems(
+            ["Spectrum"] + [f"Spectrogram: {source}" for source in self.spectrograms])
+        self.frequency_view_comboBox.currentTextChanged.connect(self.update_frequency_plot)
+        frequency_view_layout.addWidget(self.frequency_view_comboBox)
+        control_panel.addLayout(frequency_view_layout)
+
+        stft_layout = QtWidgets.QHBoxLayout()
+        stft_layout.addWidget(QtWidgets.QLabel("Window: "))
+        self.stft_window_comboBox = QtWidgets.QComboBox(self)
+        self.stft_window_comboBox.addItems(["256", "512", "1024", "2048", "4096"])
+        self.stft_window_comboBox.setCurrentText("1024")
+        self.stft_window_comboBox.currentTextChanged.connect(self.update_stft_params)
+        stft_layout.addWidget(self.stft_window_comboBox)
+        stft_layout.addWidget(QtWidgets.QLabel("Hop: "))
+        self.stft_hop_input = QtWidgets.QSpinBox()
+        self.stft_hop_input.setRange(16, 4096)
+        self.stft_hop_input.setValue(256)
+        self.stft_hop_input.valueChanged.connect(self.update_stft_params)
+        stft_layout.addWidget(self.stft_hop_input)
+        control_panel.addLayout(stft_layout)
+
+        self.spectrogram_image = pg.ImageItem()
+        self.spectrogram_image.setLookupTable(pg.colormap.get("viridis").getLookupTable())
+
         self.sampling_slider.setValue(self.sampling_rate)
         self.sampling_slider.valueChanged.connect(self.update_sampling)
         self.sampling_slider.setObjectName("samplingSlider")
@@ -115,19 +159,39 @@ class SignalSamplingApp(QtWidgets.QWidget):
         h_layout.addLayout(right_panel_layout, 1)
         layout.addLayout(h_layout)
 
+    def allocate_buffers(self):
+        # every full-length array of the pipeline, filled in place on each update instead of reallocated
+        self.signal = np.zeros(len(self.time), dtype=self.dtype)
+        self.noise_signal = np.zeros_like(self.signal)
+        self.noised_signal = np.zeros_like(self.signal)
+        self.reconstructed_signal = np.zeros_like(self.signal)
+        self.error_signal = np.zeros_like(self.signal)
+        self.fft_original = np.zeros_like(self.signal)
+        self.scratch = np.zeros_like(self.signal)  # |error| for the mean on the numpy backend
+        self.fft_freqs = fftfreq(len(self.time), self.time[1] - self.time[0])
+        # every 16th point, where the float32 drift is checked (contiguous: numba is warmed up for that)
+        self.probe_points = np.arange(0, len(self.time), 16)
+        self.probe_time = self.time[self.probe_points]
+
+    def update_precision(self, checked):
+        self.dtype = np.float32 if checked else np.float64
+        self.allocate_buffers()
+        self.update_original_signal()
+
     def open_mixer(self):
         self.mixer.show()
 
     def update_original_signal(self):
         if not self.mixer.signals:
             # default is zero if no signals are present
-            self.signal = np.zeros_like(self.time)
+            self.signal.fill(0)
             self.original_plot.clear()
             self.f_max = 2
         else:
-            self.signal, f_max = self.mixer.compose_signal(self.time)
+            _, f_max = self.mixer.compose_signal(self.time, out=self.signal)
             self.f_max = f_max
 
+        self.update_spectrum()
         self.update_sampling_slider()
         self.sample_and_reconstruct()
 
@@ -162,93 +226,45 @@ class SignalSamplingApp(QtWidgets.QWidget):
         self.sample_and_reconstruct()
 
     def update_reconstruction_method(self, text='Whittaker-Shanon (sinc)'):
-        """
-        1. sinc: for each target time (t_i), we sum contributions from all samples (s) weighted by sinc function based on 
-          distance from each sample position (x). Good for bandlimited signals / signal is sampled above Nyquist rate
-        """
-        def sinc_interp(x, s, t):  # sinc(x) = sin(πx)/(πx) (Whittaker-Shannon)
-            """
-            x: sample positions (sampling_t)
-            s: sample values (sampled_signal)
-            t: target positions (continuous time for reconstruction)
-            """
-            T = x[1] - x[0]
-            return np.array([np.sum(s * np.sinc((t_i - x) / T)) for t_i in t])
-
-        """
-        2. zero_order : for each target time (t_i), it finds index of  last sample <= t_i.. and uses its val. to hold
-          constant until next sampling point. Simpole but might lead to significant distortion, especially for rapidly changing signals.
-        """
-        def zero_order_hold(x, s, t):  # maintain last sampled value until next sample is taken
-            s_interp = np.zeros_like(t)
-            for i, t_i in enumerate(t):
-                idx = np.searchsorted(x, t_i) - 1
-                s_interp[i] = s[idx]
-            return s_interp
-
-        """
-        3. linear : for each target time (t_i), it uses np.interp function to perform linear interpolation between two nearest sample points.
-          Has smoother transition than Zero but is still bad for non-linear signals.
-        """
-        def linear_interp(x, s, t):  # connect sample points linearly
-            return np.interp(t, x, s)
-
-        """
-        4.cubic
-        """
-        def cubic_spline_interp(x, s, t):  # connects by cubic functions leading to smoother connection
-            cs = CubicSpline(x, s)
-            return cs(t)
-
-        # """
-        # 5.lagrange: good for small number of points, but can be hard to compute for large datasets and may lead to oscillations between points
-        # """
-        # def lagrange_interp(x, s, t):  # makes a polynomial through all sample points
-        #     poly = lagrange(x, s)
-        #     return poly(t)
-
-        if text == 'Zero-Order Hold':
-            self.interp_method = zero_order_hold
-        elif text == 'Linear':
-            self.interp_method = linear_interp
-        elif text == 'Cubic Spline':
-            self.interp_method = cubic_spline_interp
-        # elif text == 'Lagrange':
-        #     self.interp_method = lagrange_interp
-        else:
-            self.interp_method = sinc_interp
+        # kernels live in kernels.py, dispatched to numba when it's available
+        # ("Lagrange" was dropped: oscillates and is too slow for large datasets)
+        self.interp_method = kernels.RECONSTRUCTION_METHODS.get(text, kernels.sinc_interp)
 
         self.sample_and_reconstruct()
     
+    def update_stft_params(self):
+        window_size = int(self.stft_window_comboBox.currentText())
+        for spectrogram in self.spectrograms.values():
+            spectrogram.set_params(window_size, self.stft_hop_input.value())
+        self.update_frequency_plot()
+
     def sample_and_reconstruct(self):
         self.add_noise()
         if self.interp_method is None:
             self.update_reconstruction_method()
 
-        noised_signal = (self.noise_signal + self.signal)
+        np.add(self.signal, self.noise_signal, out=self.noised_signal)
 
         # 1.excluding first and last point ==> good reconstruction at 2 * fmax
             # sample_points = np.linspace(0, len(self.time) - 1, (self.sampling_rate * self.max_time_axis)).astype(int)  # (start, stop, #samples)
             # sample_points = sample_points[1:-1]
 
         # good reconstruction at 2 * fmax + 1
-        sample_points = np.arange(0, len(self.time) - 1, len(self.time)/(self.sampling_rate*self.max_time_axis)).astype(int)
+        sample_points = kernels.sample_indices(len(self.time), self.sampling_rate, self.max_time_axis)
+        self.sample_points = sample_points
         sampled_time = self.time[sample_points]
-        sampled_signal = noised_signal[sample_points]
+        sampled_signal = self.noised_signal[sample_points]
 
-        reconstructed_signal = self.interp_method(sampled_time, sampled_signal, self.time)
+        self.interp_method(sampled_time, sampled_signal, self.time, out=self.reconstructed_signal)
 
-        self.update_plots(sampled_time, sampled_signal, reconstructed_signal)
+        self.update_plots(sampled_time, sampled_signal, self.reconstructed_signal)
 
     def update_plots(self, sampled_time=None, sampled_signal=None, reconstructed_signal=None):
         self.original_plot.clear()
         self.reconstructed_plot.clear()
         self.error_plot.clear()
-        self.frequency_plot.clear()
-
-        noised_signal = self.noise_signal + self.signal
 
-        self.original_plot.plot(self.time, noised_signal,
+        self.original_plot.plot(self.time, self.noised_signal,
                                 pen='#007AFF', name="Original Signal")
         if sampled_time is not None and sampled_signal is not None:
             self.original_plot.plot(
@@ -259,23 +275,60 @@ class SignalSamplingApp(QtWidgets.QWidget):
 
         # calc. error graph (WITHOUT NOISE for constructed signals)
         # calc. error graph (WITHOUT NOISE for constructed signals)
-        error = self.signal - reconstructed_signal
-        text = f'error: {round(np.mean(np.abs(error)), 2)}'
+        error, mean_error = kernels.reconstruction_error(
+            self.signal, reconstructed_signal, out=self.error_signal, scratch=self.scratch)
+        text = f'error: {round(mean_error, 2)}'
+        if self.dtype == np.float32 and sampled_time is not None:
+            text += f' (float32 drift: {self.precision_drift(self.sample_points):.1e})'
+        self.set_error_title(text)
+        self.error_plot.plot(self.time, error, pen='#007AFF')
+
+        self.set_same_viewing_range()
+        self.update_frequency_plot()
 
+    def update_frequency_plot(self):
+        # only redraws the frequency panel from the current buffers, nothing is resampled
+        self.frequency_plot.clear()
+        frequency_view = self.frequency_view_comboBox.currentText()
+        if frequency_view == "Spectrum":
+            self.plot_spectrum()
+        else:
+            sources = {"Original": self.signal, "Reconstructed": self.reconstructed_signal, "Error": self.error_signal}
+            source = frequency_view.split(": ")[1]
+            self.plot_spectrogram(self.spectrograms[source], sources[source])
+
+    def set_error_title(self, text):
         title = f"""
         <div style='text-align: center;font-family: "Segoe UI", sans-serif;'>
             <span style='font-size: 10pt;'>Error Graph</span><br>
             <span style='font-size: 8pt;'><b>{text}</b></span>
         </div>"""
         self.error_plot.setTitle(title)
-        self.error_plot.plot(self.time, error, pen='#007AFF')
 
-        # Repeat for the Noised Signal
-        freqs = fftfreq(len(self.time), self.time[1] - self.time[0])
-
-        fft_original = 2*np.abs(fft(self.signal))
-
-        fft_original /= len(self.time)
+    def update_spectrum(self):
+        # the spectrum only depends on the composed signal, so it's computed here and not on every update
+        np.abs(fft(self.signal), out=self.fft_original)
+        self.fft_original *= 2 / len(self.time)
+
+    def precision_drift(self, sample_points):
+        # error metric of a float64 pipeline (composition, noise, sampling, reconstruction) on the probe
+        # points against the float32 one, to see what float32 costs; the float64 signal is only composed
+        # where it's needed (samples + probe), never at full length
+        if self.mixer.signals:
+            reference_samples = self.mixer.compose_signal(self.time, points=sample_points)[0]
+            reference_probe = self.mixer.compose_signal(self.time, points=self.probe_points)[0]
+        else:
+            reference_samples = np.zeros(len(sample_points))
+            reference_probe = np.zeros(len(self.probe_points))
+        reference_samples += self.noise_signal[sample_points]
+        reference = self.interp_method(self.time[sample_points], reference_samples, self.probe_time)
+        reference_error = np.mean(np.abs(reference_probe - reference))
+        probe_error = np.mean(np.abs(self.error_signal[self.probe_points]), dtype=np.float64)
+        return abs(reference_error - probe_error)
+
+    def plot_spectrum(self):
+        freqs = self.fft_freqs
+        fft_original = self.fft_original
 
         self.frequency_plot.plot(freqs, fft_original, pen=pg.mkPen('#007AFF', width=3))
 
@@ -285,21 +338,35 @@ class SignalSamplingApp(QtWidgets.QWidget):
         self.frequency_plot.plot(
             freqs - self.sampling_rate - 0.2, fft_original, pen=pg.mkPen('r', width=2))
 
-        self.set_same_viewing_range()
         self.frequency_plot.setXRange(-max(self.f_max, 20), max(self.f_max, 20))
+        self.frequency_plot.enableAutoRange(axis='y')  # the spectrogram view fixes the Y range
+
+    def plot_spectrogram(self, spectrogram, signal):
+        # x: frame centre time, y: frequency, colour: magnitude in dB
+        magnitude = spectrogram.compute(signal)
+        if magnitude is None:
+            return
+        fs = 1 / (self.time[1] - self.time[0])
+        frame_times = spectrogram.frame_times(fs, self.time[0])
+        frame_step = spectrogram.hop / fs
+        freqs = spectrogram.frequencies(fs)
+        df = fs / spectrogram.window_size  # each row is one bin centred on its frequency
+
+        self.spectrogram_image.setImage(magnitude, autoLevels=False,
+                                        levels=(magnitude.max() - 80, magnitude.max()))
+        self.spectrogram_image.setRect(QtCore.QRectF(
+            frame_times[0] - frame_step / 2, -df / 2, len(frame_times) * frame_step, len(freqs) * df))
+        self.frequency_plot.addItem(self.spectrogram_image)
+
+        self.frequency_plot.setXRange(self.time[0], self.time[-1])
+        self.frequency_plot.setYRange(0, min(max(self.f_max, 20) * 2, freqs[-1]))
 
     def add_noise(self):
-        # convert SNR from dB to linear scale
-        snr_linear = 10 ** (self.mixer.snr_slider.value() / 10.0)
-        signal_power = np.mean(self.signal ** 2)  # calculate signal power
-        # calculate noise power to achieve req. SNR
-        noise_power = signal_power / snr_linear
-        self.noise_signal = np.random.normal(
-            0, np.sqrt(noise_power), self.signal.shape)  # generate Gaussian noise with: mean = 0 , calculated standard deviation
+        kernels.gaussian_noise(self.signal, self.mixer.snr_slider.value(), self.rng, out=self.noise_signal)
 
     def set_same_viewing_range(self):
-        x_min, x_max = min(self.time), max(self.time)
-        y_min, y_max = min(self.signal), max(self.signal)
+        x_min, x_max = self.time[0], self.time[-1]
+        y_min, y_max = self.signal.min(), self.signal.max()
 
         self.original_plot.setXRange(x_min, x_max)
         self.reconstructed_plot.setXRange(x_min, x_max)
@@ -326,7 +393,7 @@ class SignalSamplingApp(QtWidgets.QWidget):
         if file_name:
             try:
                 signal = np.insert(
-                    self.signal + self.noise_signal, 0, self.f_max)
+                    self.noised_signal, 0, self.f_max)
                 np.savetxt(file_name, signal, delimiter=",")
                 QMessageBox.information(
                     self, "Success", "File saved successfully!")
@@ -345,6 +412,7 @@ if __name__ == '__main__':
     app = QtWidgets.QApplication(sys.argv)
     with open("style/style.qss", "r") as f:
         app.setStyleSheet(f.read())
+    kernels.warm_up()
     window = SignalSamplingApp()
     window.main()
     sys.exit(app.exec_())
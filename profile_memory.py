@@ -0,0 +1,65 @@
+"""
+peak memory allocated by one update (sample_and_reconstruct) in float64 and float32 mode, per reconstruction
+method, measured with tracemalloc (numpy reports its buffers to it), plus the float32 error metric drift
+
+    python profile_memory.py
+    python profile_memory.py "Sampling_scenarios/ECG_Signal.csv" --rate 40
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import sys
+import tracemalloc
+
+from PyQt5 import QtWidgets
+
+import kernels
+from main import SignalSamplingApp
+from signal_mixer import SignalMixer
+
+
+def peak_update_memory(window, repeats=5):
+    window.sample_and_reconstruct()  # builds the per-rate lookups and compiles/loads the numba kernels
+    peaks = []
+    for _ in range(repeats):
+        tracemalloc.start()
+        window.sample_and_reconstruct()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(peaks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak memory per update in float64 and float32 mode.")
+    parser.add_argument("signal_file", nargs="?", help="signal file to load (default: 2 Hz + 6 Hz tones)")
+    parser.add_argument("--rate", type=int, default=20, help="sampling rate in Hz (default 20)")
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    kernels.warm_up()
+    window = SignalSamplingApp()
+    if args.signal_file:
+        window.mixer.add_component(imported_signal=SignalMixer.read_signal_file(args.signal_file))
+    else:
+        for frequency in (2, 6):
+            window.mixer.frequency_input.setValue(frequency)
+            window.mixer.add_component()
+
+    print(f"backend: {kernels.BACKEND}, {len(window.time)} points, sampling at {args.rate} Hz")
+    print(f"{'method':<26}{'float64':>12}{'float32':>12}{'ratio':>8}")
+    for method in kernels.RECONSTRUCTION_METHODS:
+        peaks = []
+        for single_precision in (False, True):
+            window.update_precision(single_precision)
+            window.sampling_rate = args.rate
+            window.interp_method = kernels.RECONSTRUCTION_METHODS[method]
+            peaks.append(peak_update_memory(window))
+        drift = window.precision_drift(window.sample_points)
+        print(f"{method:<26}{peaks[0] / 1024:>10.0f}kB{peaks[1] / 1024:>10.0f}kB"
+              f"{peaks[1] / peaks[0]:>8.2f}   float32 drift: {drift:.1e}")
+    window.close()
+
+
+if __name__ == '__main__':
+    main()
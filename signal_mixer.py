@@ -6,6 +6,7 @@ from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QTreeWidget, QTreeWidgetItem
 
 from signal_construct import Signal
+import kernels
 
 
 
@@ -186,9 +187,18 @@ class SignalMixer(QtWidgets.QWidget):
     def emit_update_signal(self):
         self.update_signal.emit()  
 
-    def compose_signal(self, time):
-        # mixed signal from current signals
-        mixed_signal = np.zeros_like(time)
+    def compose_signal(self, time, out=None, points=None):
+        # mixed signal from current signals, written into out (any float dtype) when given
+        # points: only evaluate at these indices of time (same values as the full composition there)
+        n_points = len(time)
+        if points is not None:
+            time = time[points]
+        if out is None:
+            mixed_signal = np.zeros_like(time)
+        else:
+            mixed_signal = out
+            mixed_signal.fill(0)
+        tones = []  # sinusoidal components, synthesized together in one fused kernel
         f_max = 2
         selected_item = self.signal_list.currentItem()
         if selected_item:
@@ -211,72 +221,79 @@ class SignalMixer(QtWidgets.QWidget):
         if isinstance(signal, list): 
             for component in signal:
                 if isinstance(component, tuple) and len(component) == 3:
-                    frequency, amplitude, phase = component
-                    phase_rad = np.deg2rad(phase)
-                    mixed_signal += amplitude * np.sin(2 * np.pi * frequency * time + phase_rad)
+                    tones.append(component)
+                    frequency = component[0]
                     f_max = frequency if frequency > f_max else f_max
                 elif isinstance(component, Signal):
-                    if len(component.data) != len(mixed_signal):
+                    if len(component.data) != n_points:
+                        positions = np.linspace(0, 1, n_points)
                         component_data_resized = np.interp(
-                            np.linspace(0, 1, len(mixed_signal)),
+                            positions if points is None else positions[points],
                             np.linspace(0, 1, len(component.data)),
                             component.data
                         )
                         mixed_signal += component_data_resized
                     else:
-                        mixed_signal += component.data
+                        mixed_signal += component.data if points is None else component.data[points]
                     f_max = int(component.f_sample) if int(component.f_sample) > f_max else f_max
 
                 else:
                     raise ValueError("Unsupported component format: {}".format(component))
         elif isinstance(signal, tuple) and len(signal) == 3:
-            frequency, amplitude, phase = signal
-            phase_rad = np.deg2rad(phase)
-            mixed_signal += amplitude * np.sin(2 * np.pi * frequency * time + phase_rad)
+            tones.append(signal)
+            frequency = signal[0]
             f_max = frequency if frequency > f_max else f_max
         elif isinstance(signal, Signal):
-            mixed_signal += signal.data 
+            mixed_signal += signal.data if points is None else signal.data[points]
             f_max = int(signal.f_sample) if int(signal.f_sample) > f_max else f_max
         else:
             raise ValueError("Unsupported signal format: {}".format(signal))
 
+        kernels.compose_tones(time, tones, mixed_signal)
         return mixed_signal, f_max
     
 
     def import_signal_file(self):
         file_name, _ = QFileDialog.getOpenFileName()
-        sampling_rate = 1
-        if file_name:
-            extension = os.path.splitext(file_name)[1].lower()
-            if extension == '.csv':
-                with open(file_name, mode='r') as file:
-                    #read sampling rate from 1st line
-                    sampling_rate = float(file.readline().strip())
-                    signal_data = np.genfromtxt(file, delimiter=',')
-            elif extension == '.txt':
-                signal_data = np.loadtxt(file_name)
-            elif extension == '.bin':
-                with open(file_name, 'rb') as f:
-                    signal_data = np.fromfile(f, dtype=np.float32)
-            else:
-                self.show_error_message("Unsupported file format.")
-                return
-        else:
+        if not file_name:
+            return
+
+        try:
+            new_signal = self.read_signal_file(file_name)
+        except ValueError as e:
+            self.show_error_message(str(e))
             return
 
-        if signal_data.ndim == 1:
-            new_signal = Signal(
-                signal_data=signal_data,
-                title=os.path.splitext(os.path.basename(file_name))[0],
-                f_sample=sampling_rate
-            )
+        self.add_component(imported_signal=new_signal)
+        self.max_length = max(self.max_length, len(new_signal.data))
+        self.emit_update_signal() 
 
-            self.add_component(imported_signal=new_signal)
-            self.max_length = max(self.max_length, len(signal_data))
-            self.emit_update_signal() 
-            
+    @staticmethod
+    def read_signal_file(file_name):
+        # also used without the file dialog (batch_render.py)
+        sampling_rate = 1
+        extension = os.path.splitext(file_name)[1].lower()
+        if extension == '.csv':
+            with open(file_name, mode='r') as file:
+                #read sampling rate from 1st line
+                sampling_rate = float(file.readline().strip())
+                signal_data = np.genfromtxt(file, delimiter=',')
+        elif extension == '.txt':
+            signal_data = np.loadtxt(file_name)
+        elif extension == '.bin':
+            with open(file_name, 'rb') as f:
+                signal_data = np.fromfile(f, dtype=np.float32)
         else:
-            self.show_error_message("Unsupported signal dimension: " + str(signal_data.ndim))
+            raise ValueError("Unsupported file format.")
+
+        if signal_data.ndim != 1:
+            raise ValueError("Unsupported signal dimension: " + str(signal_data.ndim))
+
+        return Signal(
+            signal_data=signal_data,
+            title=os.path.splitext(os.path.basename(file_name))[0],
+            f_sample=sampling_rate
+        )
 
         
     def show_error_message(self, message):
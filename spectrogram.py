@@ -0,0 +1,62 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfft, rfftfreq
+from scipy.signal import get_window
+
+
+class Spectrogram():
+    """
+    short-time spectrum (dB) of a signal, frames are strided views over the signal (no frame copies)
+    and only frames that changed since the last call are recomputed
+    """
+    batch_frames = 256  # frames per rfft batch, bounds the windowed temporary
+
+    def __init__(self, window_size=1024, hop=256, window='hann'):
+        self.set_params(window_size, hop, window)
+
+    def set_params(self, window_size, hop, window='hann'):
+        self.window_size = int(window_size)
+        self.hop = max(1, int(hop))
+        self.window = get_window(window, self.window_size)
+        self.reset()
+
+    def reset(self):
+        self._signal = None  # copy of the last computed input
+        self.magnitude = None  # (n_frames, n_bins) in dB
+
+    def frame_times(self, fs, t0=0.0):
+        # centre time of every frame
+        n_frames = 0 if self.magnitude is None else self.magnitude.shape[0]
+        return t0 + (np.arange(n_frames) * self.hop + self.window_size / 2) / fs
+
+    def frequencies(self, fs):
+        return rfftfreq(self.window_size, 1 / fs)
+
+    def compute(self, signal):
+        if len(signal) < self.window_size:
+            self.reset()
+            return None
+
+        frames = sliding_window_view(signal, self.window_size)[::self.hop]
+        n_frames = frames.shape[0]
+
+        if self._signal is None or self._signal.shape != signal.shape or self._signal.dtype != signal.dtype:
+            self._signal = np.empty_like(signal)
+            self.magnitude = np.empty((n_frames, self.window_size // 2 + 1), dtype=np.float32)
+            dirty = np.arange(n_frames)
+        else:
+            # frame f covers samples [f*hop, f*hop + window_size), it's dirty if any of them changed
+            changed = np.concatenate(([0], np.cumsum(signal != self._signal)))
+            starts = np.arange(n_frames) * self.hop
+            dirty = np.flatnonzero(changed[starts + self.window_size] != changed[starts])
+
+        window = self.window.astype(signal.dtype, copy=False)  # keeps float32 frames in float32
+        for start in range(0, len(dirty), self.batch_frames):
+            batch = dirty[start:start + self.batch_frames]
+            if batch[-1] - batch[0] + 1 == len(batch):  # contiguous run -> keep it a view
+                batch = slice(batch[0], batch[-1] + 1)
+            spectrum = np.abs(rfft(frames[batch] * window, axis=-1))
+            self.magnitude[batch] = 20 * np.log10(spectrum + 1e-12)
+
+        self._signal[:] = signal
+        return self.magnitude
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+# the equivalence check needs both backends
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("numba")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import kernels
+
+# float32 sums/products run in float32 on the numpy side and accumulate in float64 in numba
+TOLERANCES = {np.float64: dict(rtol=1e-9, atol=1e-9), np.float32: dict(rtol=1e-4, atol=1e-4)}
+
+
+@pytest.fixture
+def grid():
+    time = np.linspace(0, 10, 2000)
+    x = time[kernels.sample_indices(len(time), 7, 10)]
+    return time, x
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_sinc_interp_backends_match(grid, dtype):
+    time, x = grid
+    s = (np.sin(2 * np.pi * 1.5 * x) + 0.3 * np.cos(2 * np.pi * 2.5 * x)).astype(dtype)
+    T = x[1] - x[0]
+    expected = kernels._sinc_interp_np(x, s, time, T, np.empty(len(time), dtype=dtype))
+    result = kernels._sinc_interp_nb(x, s, time, T, np.empty(len(time), dtype=dtype))
+    np.testing.assert_allclose(result, expected, **TOLERANCES[dtype])
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_zero_order_hold_backends_match(grid, dtype):
+    time, x = grid
+    s = np.sin(2 * np.pi * 1.5 * x).astype(dtype)
+    expected = kernels._zero_order_hold_np(x, s, time, np.empty(len(time), dtype=dtype))
+    result = kernels._zero_order_hold_nb(x, s, time, np.empty(len(time), dtype=dtype))
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_compose_tones_backends_match(grid, dtype):
+    time, _ = grid
+    omegas = 2 * np.pi * np.array([2.0, 6.0, 15.0])
+    amplitudes = np.array([1.0, 0.5, 3.0])
+    phases = np.deg2rad(np.array([0.0, 90.0, -45.0]))
+    expected = kernels._compose_tones_np(time, omegas, amplitudes, phases, np.ones(len(time), dtype=dtype))
+    result = kernels._compose_tones_nb(time, omegas, amplitudes, phases, np.ones(len(time), dtype=dtype))
+    np.testing.assert_allclose(result, expected, **TOLERANCES[dtype])
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_error_backends_match(grid, dtype):
+    time, _ = grid
+    signal = np.sin(2 * np.pi * 3 * time).astype(dtype)
+    reconstructed = np.sin(2 * np.pi * 3 * time + 0.1).astype(dtype)
+    expected, expected_mean = kernels._error_np(
+        signal, reconstructed, np.empty_like(signal), np.empty_like(signal))
+    result, result_mean = kernels._error_nb(signal, reconstructed, np.empty_like(signal))
+    np.testing.assert_allclose(result, expected, **TOLERANCES[dtype])
+    np.testing.assert_allclose(result_mean, expected_mean, **TOLERANCES[dtype])